@@ -0,0 +1,113 @@
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+
+# Every board fits in a single base-3 integer. Square i contributes digit * 3**i, where the digit
+# is 0 for empty, 1 for your counter and 2 for your opponent's counter.
+N_BOARD_CODES = 3**9
+POWERS_OF_3 = tuple(3**i for i in range(9))
+
+_DIGITS: Dict = {0: 0, 1: 1, -1: 2, " ": 0, "X": 1, "O": 2}
+_COUNTERS = (0, 1, -1)
+
+WINNING_LINES = (
+    (0, 1, 2),
+    (3, 4, 5),
+    (6, 7, 8),
+    (0, 3, 6),
+    (1, 4, 7),
+    (2, 5, 8),
+    (0, 4, 8),
+    (2, 4, 6),
+)
+
+# The 8 symmetries of the square. A transformed board is built as new_board[i] = board[perm[i]]
+SYMMETRIES = (
+    (0, 1, 2, 3, 4, 5, 6, 7, 8),  # identity
+    (6, 3, 0, 7, 4, 1, 8, 5, 2),  # rotate 90 clockwise
+    (8, 7, 6, 5, 4, 3, 2, 1, 0),  # rotate 180
+    (2, 5, 8, 1, 4, 7, 0, 3, 6),  # rotate 270 clockwise
+    (2, 1, 0, 5, 4, 3, 8, 7, 6),  # mirror left-right
+    (6, 7, 8, 3, 4, 5, 0, 1, 2),  # mirror top-bottom
+    (0, 3, 6, 1, 4, 7, 2, 5, 8),  # transpose
+    (8, 5, 2, 7, 4, 1, 6, 3, 0),  # anti-transpose
+)
+
+
+def board_to_code(board: Sequence) -> int:
+    """Encode a board as an integer in range(3**9).
+
+    Accepts the choose_move() format (0, 1, -1) as well as the Cell format (" ", "X", "O"), where X
+    is treated as 1.
+    """
+    return sum(_DIGITS[counter] * power for counter, power in zip(board, POWERS_OF_3))
+
+
+def code_to_board(code: int) -> List[int]:
+    """Decode an integer from board_to_code() into a choose_move() style board."""
+    board = []
+    for _ in range(9):
+        code, digit = divmod(code, 3)
+        board.append(_COUNTERS[digit])
+    return board
+
+
+def boards_to_codes(boards: np.ndarray) -> np.ndarray:
+    """Vectorised board_to_code() for an (n, 9) array of 0, 1, -1 boards."""
+    digits = np.asarray(boards, dtype=np.int64) % 3  # -1 -> 2
+    return digits @ np.array(POWERS_OF_3, dtype=np.int64)
+
+
+def codes_to_boards(codes: np.ndarray) -> np.ndarray:
+    """Vectorised code_to_board(), returns an (n, 9) int8 array of 0, 1, -1 boards."""
+    digits = (np.asarray(codes, dtype=np.int64)[:, None] // POWERS_OF_3) % 3
+    boards = digits.astype(np.int8)
+    boards[boards == 2] = -1
+    return boards
+
+
+def flip_code(code: int) -> int:
+    """The code of the same board seen from the other player's perspective."""
+    return int(_FLIPPED_CODES[code])
+
+
+def transform_board(board: Sequence, symmetry: int) -> List:
+    perm = SYMMETRIES[symmetry]
+    return [board[idx] for idx in perm]
+
+
+def transform_move(move: int, symmetry: int) -> int:
+    """Map a move on the original board to the equivalent move on the transformed board."""
+    return SYMMETRIES[symmetry].index(move)
+
+
+def untransform_move(move: int, symmetry: int) -> int:
+    """Map a move on a transformed board back onto the original board."""
+    return SYMMETRIES[symmetry][move]
+
+
+def canonical_code(board: Sequence) -> Tuple[int, int]:
+    """Find the smallest code among the 8 symmetric versions of board.
+
+    Returns:
+        code: the canonical code
+        symmetry: index into SYMMETRIES that transforms board into the canonical board
+    """
+    return min(
+        (board_to_code(transform_board(board, symmetry)), symmetry)
+        for symmetry in range(len(SYMMETRIES))
+    )
+
+
+def has_won(board: Sequence, counter: int = 1) -> bool:
+    """Whether counter has 3 in a row on a choose_move() style board."""
+    return any(all(board[idx] == counter for idx in line) for line in WINNING_LINES)
+
+
+def _build_flipped_codes() -> np.ndarray:
+    digits = (np.arange(N_BOARD_CODES)[:, None] // POWERS_OF_3) % 3
+    flipped = (3 - digits) % 3  # 1 <-> 2, 0 stays 0
+    return flipped @ np.array(POWERS_OF_3)
+
+
+_FLIPPED_CODES = _build_flipped_codes()
@@ -0,0 +1,253 @@
+import importlib.util
+import math
+import multiprocessing
+import numbers
+import os
+import resource
+import select
+import sys
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Union
+
+# Runs each team's choose_move in its own long-lived worker process (POSIX only).
+#
+# Protocol: the host writes a board as 9 bytes (counter + 1, so -1, 0, 1 -> 0, 1, 2) and the worker
+# replies with a single byte, the chosen position or ERROR_REPLY if choose_move raised or returned
+# something that isn't a position.
+BOARD_SIZE = 9
+ERROR_REPLY = 255
+
+# Where the open fds of the current process are listed, on Linux and on macOS / BSD
+_FD_DIRS = ["/proc/self/fd", "/dev/fd"]
+
+BotSource = Union[str, Path, Callable[[List[int]], int]]
+
+
+class BotError(Exception):
+    """choose_move raised an exception or returned an invalid position."""
+
+
+class BotTimeout(BotError):
+    """choose_move took longer than the move timeout. The worker is restarted."""
+
+
+class BotCrashed(BotError):
+    """The worker died, e.g. by going over its memory or CPU limit. The worker is restarted."""
+
+
+def load_choose_move(main_path: Union[str, Path]) -> Callable[[List[int]], int]:
+    """Import choose_move from a team's main.py."""
+    main_path = Path(main_path).resolve()
+    # main.py imports game_mechanics from its own directory
+    sys.path.insert(0, str(main_path.parent))
+    spec = importlib.util.spec_from_file_location(f"bot_{main_path.parent.name}", main_path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)  # type: ignore
+    return module.choose_move
+
+
+def _read_exactly(fd: int, n_bytes: int) -> bytes:
+    """Read n_bytes from fd, or fewer if the other end is closed."""
+    data = b""
+    while len(data) < n_bytes:
+        chunk = os.read(fd, n_bytes - len(data))
+        if not chunk:
+            break
+        data += chunk
+    return data
+
+
+def _close_inherited_fds(keep_fds: List[int]) -> None:
+    """Close every fd apart from stdin, stdout, stderr and keep_fds.
+
+    A forked worker inherits every fd of the host, including the pipes of every worker started
+    before it. Without this a bot could read and write other teams' boards and moves.
+    """
+    for fd_dir in _FD_DIRS:
+        if os.path.isdir(fd_dir):
+            open_fds = [int(name) for name in os.listdir(fd_dir)]
+            break
+    else:
+        raise RuntimeError(f"Can't list open fds, none of {_FD_DIRS} exist")
+
+    keep = {0, 1, 2, *keep_fds}
+    for fd in open_fds:
+        if fd not in keep:
+            try:
+                os.close(fd)
+            except OSError:
+                # The fd listdir() used to read the directory is listed but already closed
+                pass
+
+
+def _limit_cpu_time(seconds: int, hard_limit: int) -> None:
+    """Let the worker use seconds more CPU time from now on before it is sent SIGXCPU and dies.
+
+    RLIMIT_CPU counts the CPU time of the whole process, so the soft limit is moved on before
+    every move. It's in whole seconds, so a move can get up to a second more than asked for.
+    """
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    soft_limit = math.ceil(usage.ru_utime + usage.ru_stime) + seconds
+    # The hard limit can't be raised again once lowered, so it's left as it was
+    if hard_limit != resource.RLIM_INFINITY:
+        soft_limit = min(soft_limit, hard_limit)
+    resource.setrlimit(resource.RLIMIT_CPU, (soft_limit, hard_limit))
+
+
+def _worker(
+    source: BotSource,
+    board_fd: int,
+    reply_fd: int,
+    memory_limit_mb: Optional[int],
+    move_cpu_time_limit: Optional[int],
+) -> None:
+    _close_inherited_fds([board_fd, reply_fd])
+
+    if memory_limit_mb is not None:
+        limit = memory_limit_mb * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+    _, cpu_hard_limit = resource.getrlimit(resource.RLIMIT_CPU)
+
+    choose_move = source if callable(source) else load_choose_move(source)
+
+    while True:
+        message = _read_exactly(board_fd, BOARD_SIZE)
+        if len(message) < BOARD_SIZE:
+            # Host has gone away
+            return
+        board = [byte - 1 for byte in message]
+        if move_cpu_time_limit is not None:
+            _limit_cpu_time(move_cpu_time_limit, cpu_hard_limit)
+        try:
+            move = choose_move(board)
+            valid = isinstance(move, numbers.Integral) and move in range(BOARD_SIZE)
+            reply = int(move) if valid else ERROR_REPLY
+        except Exception:
+            reply = ERROR_REPLY
+        os.write(reply_fd, bytes([reply]))
+
+
+class BotHost:
+    def __init__(
+        self,
+        source: BotSource,
+        move_timeout: float = 1.0,
+        memory_limit_mb: Optional[int] = 512,
+        move_cpu_time_limit: Optional[int] = None,
+    ):
+        """Runs a choose_move function in a separate, resource-limited worker process.
+
+        The worker is started once and reused for every move of every game. If it times out or dies
+        it is replaced by a fresh worker on the next call. A BotHost can be passed anywhere a
+        choose_move function is expected, e.g. to play_ttt_game().
+
+        Args:
+            source: path to a team's main.py, or a choose_move function
+            move_timeout: seconds choose_move has to return a move
+            memory_limit_mb: address space limit of the worker process
+            move_cpu_time_limit: CPU seconds choose_move can use on each move before the worker is
+                  killed
+        """
+        self.source = source
+        self.move_timeout = move_timeout
+        self.memory_limit_mb = memory_limit_mb
+        self.move_cpu_time_limit = move_cpu_time_limit
+        self.process: Optional[multiprocessing.process.BaseProcess] = None
+        self.n_restarts = 0
+
+    def start(self) -> None:
+        if self.process is not None:
+            return
+
+        board_read, self._board_write = os.pipe()
+        self._reply_read, reply_write = os.pipe()
+        context = multiprocessing.get_context("fork")
+        self.process = context.Process(
+            target=_worker,
+            args=(
+                self.source,
+                board_read,
+                reply_write,
+                self.memory_limit_mb,
+                self.move_cpu_time_limit,
+            ),
+            daemon=True,
+        )
+        self.process.start()
+        # Only the worker holds these ends, so reads see EOF as soon as it dies
+        os.close(board_read)
+        os.close(reply_write)
+
+    def close(self) -> None:
+        if self.process is None:
+            return
+        os.close(self._board_write)
+        os.close(self._reply_read)
+        self.process.kill()
+        self.process.join()
+        self.process = None
+
+    def restart(self) -> None:
+        self.close()
+        self.n_restarts += 1
+        self.start()
+
+    def choose_move(self, board: List[int]) -> int:
+        self.start()
+        try:
+            os.write(self._board_write, bytes(counter + 1 for counter in board))
+        except BrokenPipeError:
+            self.restart()
+            raise BotCrashed("Bot worker died before it was sent the board")
+
+        ready, _, _ = select.select([self._reply_read], [], [], self.move_timeout)
+        if not ready:
+            self.restart()
+            raise BotTimeout(f"Bot took longer than {self.move_timeout}s to choose a move")
+
+        reply = _read_exactly(self._reply_read, 1)
+        if not reply:
+            self.restart()
+            raise BotCrashed("Bot worker died while choosing a move")
+        if reply[0] == ERROR_REPLY:
+            raise BotError("choose_move raised an exception or returned an invalid position")
+        return reply[0]
+
+    def __call__(self, board: List[int]) -> int:
+        return self.choose_move(board)
+
+    def __enter__(self) -> "BotHost":
+        self.start()
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+
+class BotPool:
+    def __init__(self, sources: Dict[str, BotSource], **limits):
+        """Pre-forks a BotHost for every team.
+
+        Args:
+            sources: team name -> path to main.py or choose_move function
+            limits: passed on to every BotHost, e.g. move_timeout
+        """
+        self.hosts = {team_name: BotHost(source, **limits) for team_name, source in sources.items()}
+
+    def start(self) -> None:
+        for host in self.hosts.values():
+            host.start()
+
+    def close(self) -> None:
+        for host in self.hosts.values():
+            host.close()
+
+    def __getitem__(self, team_name: str) -> BotHost:
+        return self.hosts[team_name]
+
+    def __enter__(self) -> "BotPool":
+        self.start()
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
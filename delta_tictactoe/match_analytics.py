@@ -0,0 +1,244 @@
+from pathlib import Path
+from typing import Dict, Iterable, List, Sequence, Tuple, Union
+
+import numpy as np
+
+from board_encoding import N_BOARD_CODES, POWERS_OF_3, code_to_board
+from game_mechanics import Player, WildTictactoeEnv, is_winner
+
+# Outcomes are from the perspective of the player (the one passing actions to step())
+WIN = 0
+DRAW = 1
+LOSS = 2
+N_OUTCOMES = 3
+
+# First index of the went_first counters
+PLAYER_FIRST = 0
+OPPONENT_FIRST = 1
+
+_POWERS_OF_3 = np.array(POWERS_OF_3, dtype=np.int64)
+
+# Below this many indices _scatter_add() uses np.add.at rather than np.bincount
+_BINCOUNT_MIN_INDICES = 256
+
+# A game as consumed by OutcomeStats.consume(): (went_first, moves in order, outcome)
+Game = Tuple[str, Sequence[int], int]
+
+
+class OutcomeStats:
+    def __init__(self):
+        """Aggregated outcome counters over any number of games.
+
+        Raw games are never stored, only counts, so memory use is fixed (about 500KB) however many
+        games are recorded. Stats built by parallel workers can be combined with merge() or +.
+
+        Counters, each with a final dimension of size 3 indexed by WIN, DRAW, LOSS:
+            by_went_first: (2,) indexed by PLAYER_FIRST / OPPONENT_FIRST
+            by_opening: (2, 9) by who went first and the first move of the game
+            by_sequence: (2, 81) by who went first and the first 2 moves (first * 9 + second)
+            by_position: (3**9,) by board code of every position the player had to move from.
+                Boards are as the player's choose_move() saw them (1 is the player)
+        """
+        self.by_went_first = np.zeros((2, N_OUTCOMES), dtype=np.int64)
+        self.by_opening = np.zeros((2, 9, N_OUTCOMES), dtype=np.int64)
+        self.by_sequence = np.zeros((2, 81, N_OUTCOMES), dtype=np.int64)
+        self.by_position = np.zeros((N_BOARD_CODES, N_OUTCOMES), dtype=np.int64)
+
+    @property
+    def n_games(self) -> int:
+        return int(self.by_went_first.sum())
+
+    ####################### RECORDING #############################
+
+    def record_batch(
+        self, player_first: np.ndarray, moves: np.ndarray, outcomes: np.ndarray
+    ) -> None:
+        """Record many games at once.
+
+        Args:
+            player_first: (n,) bool, whether the player went first
+            moves: (n, 9) int, positions played in order. Padded with -1 after the game ends
+            outcomes: (n,) int, WIN, DRAW or LOSS for the player
+        """
+        player_first = np.asarray(player_first, dtype=bool)
+        moves = np.asarray(moves, dtype=np.int64)
+        outcomes = np.asarray(outcomes, dtype=np.int64)
+        first = np.where(player_first, PLAYER_FIRST, OPPONENT_FIRST)
+
+        _scatter_add(self.by_went_first, first * N_OUTCOMES + outcomes)
+        _scatter_add(self.by_opening, (first * 9 + moves[:, 0]) * N_OUTCOMES + outcomes)
+        has_second_move = moves[:, 1] >= 0
+        _scatter_add(
+            self.by_sequence,
+            ((first * 81 + moves[:, 0] * 9 + moves[:, 1]) * N_OUTCOMES + outcomes)[has_second_move],
+        )
+
+        # Replay every game at once. On ply k the player moves if k is even and they went first,
+        # or k is odd and they went second. The player's counters are digit 1, the opponent's 2
+        plies = np.arange(9)
+        player_to_move = (plies % 2 == 0) == player_first[:, None]
+        played = moves >= 0
+        digits = np.where(player_to_move, 1, 2)
+        contributions = np.where(played, digits * _POWERS_OF_3[np.maximum(moves, 0)], 0)
+        # Code of the board before each ply is the sum of all earlier contributions
+        codes_before = np.cumsum(contributions, axis=1) - contributions
+
+        decisions = player_to_move & played
+        outcome_per_ply = np.broadcast_to(outcomes[:, None], moves.shape)
+        _scatter_add(
+            self.by_position, codes_before[decisions] * N_OUTCOMES + outcome_per_ply[decisions]
+        )
+
+    def record_game(self, went_first: str, moves: Sequence[int], outcome: int) -> None:
+        """Record a single game.
+
+        Args:
+            went_first: Player.player or Player.opponent, as in WildTictactoeEnv.went_first
+            moves: positions played in order by both sides
+            outcome: WIN, DRAW or LOSS for the player
+        """
+        # Scalar updates, the array setup in record_batch() costs far more than one game's counts
+        first = PLAYER_FIRST if went_first == Player.player else OPPONENT_FIRST
+        self.by_went_first[first, outcome] += 1
+        self.by_opening[first, moves[0], outcome] += 1
+        if len(moves) > 1:
+            self.by_sequence[first, moves[0] * 9 + moves[1], outcome] += 1
+
+        code = 0
+        player_to_move = first == PLAYER_FIRST
+        for move in moves:
+            if player_to_move:
+                self.by_position[code, outcome] += 1
+                code += POWERS_OF_3[move]
+            else:
+                code += 2 * POWERS_OF_3[move]
+            player_to_move = not player_to_move
+
+    def record_env(self, env: WildTictactoeEnv) -> None:
+        """Record a finished game straight from the environment it was played in."""
+        assert env.done, "Game is not over yet"
+        self.record_game(*game_from_env(env))
+
+    def consume(self, games: Iterable[Game], batch_size: int = 65536) -> None:
+        """Record a stream of games, batch_size at a time so the stream is never held in memory.
+
+        Args:
+            games: iterable of (went_first, moves, outcome), see record_game()
+            batch_size: number of games converted to arrays at once
+        """
+        player_first = np.zeros(batch_size, dtype=bool)
+        moves = np.full((batch_size, 9), -1, dtype=np.int64)
+        outcomes = np.zeros(batch_size, dtype=np.int64)
+
+        n_buffered = 0
+        for went_first, game_moves, outcome in games:
+            player_first[n_buffered] = went_first == Player.player
+            moves[n_buffered, : len(game_moves)] = game_moves
+            outcomes[n_buffered] = outcome
+            n_buffered += 1
+
+            if n_buffered == batch_size:
+                self.record_batch(player_first, moves, outcomes)
+                moves.fill(-1)
+                n_buffered = 0
+
+        if n_buffered:
+            self.record_batch(player_first[:n_buffered], moves[:n_buffered], outcomes[:n_buffered])
+
+    ####################### COMBINING #############################
+
+    def merge(self, other: "OutcomeStats") -> "OutcomeStats":
+        """Add the counts from other into these stats in place."""
+        self.by_went_first += other.by_went_first
+        self.by_opening += other.by_opening
+        self.by_sequence += other.by_sequence
+        self.by_position += other.by_position
+        return self
+
+    def __add__(self, other: "OutcomeStats") -> "OutcomeStats":
+        return OutcomeStats().merge(self).merge(other)
+
+    def save(self, path: Union[str, Path]) -> None:
+        with open(path, "wb") as f:
+            np.savez_compressed(
+                f,
+                by_went_first=self.by_went_first,
+                by_opening=self.by_opening,
+                by_sequence=self.by_sequence,
+                by_position=self.by_position,
+            )
+
+    @classmethod
+    def load(cls, path: Union[str, Path]) -> "OutcomeStats":
+        stats = cls()
+        with np.load(path) as arrays:
+            stats.by_went_first = arrays["by_went_first"]
+            stats.by_opening = arrays["by_opening"]
+            stats.by_sequence = arrays["by_sequence"]
+            stats.by_position = arrays["by_position"]
+        return stats
+
+    ####################### QUERIES #############################
+
+    def rates_by_went_first(self) -> Dict[str, np.ndarray]:
+        """Win, draw and loss rates for the player, split by who went first."""
+        rates = _rates(self.by_went_first)
+        return {Player.player: rates[PLAYER_FIRST], Player.opponent: rates[OPPONENT_FIRST]}
+
+    def opening_rates(self, went_first: str = Player.player) -> np.ndarray:
+        """(9, 3) win, draw and loss rates for the player, by the first move of the game."""
+        return _rates(self.by_opening[_went_first_index(went_first)])
+
+    def sequence_rates(self, went_first: str = Player.player) -> np.ndarray:
+        """(9, 9, 3) win, draw and loss rates for the player, by the first 2 moves of the game."""
+        return _rates(self.by_sequence[_went_first_index(went_first)]).reshape(9, 9, N_OUTCOMES)
+
+    def losing_positions(self, n: int = 10, min_games: int = 1) -> List[Tuple[List[int], int, int]]:
+        """The positions the player lost from most often.
+
+        Returns: list of (board, number of losses, number of games) with the most losses first.
+            Boards are as the player's choose_move() saw them
+        """
+        losses = self.by_position[:, LOSS]
+        games = self.by_position.sum(axis=1)
+        candidates = np.flatnonzero((losses > 0) & (games >= min_games))
+        n = min(n, len(candidates))
+        if n <= 0:
+            return []
+        # argpartition rather than a full sort, there are up to 3**9 candidates
+        top = candidates[np.argpartition(-losses[candidates], n - 1)[:n]]
+        top = top[np.argsort(-losses[top], kind="stable")]
+        return [(code_to_board(int(code)), int(losses[code]), int(games[code])) for code in top]
+
+
+def game_from_env(env: WildTictactoeEnv) -> Game:
+    """(went_first, moves, outcome) for the game most recently played in env."""
+    # counter_players is filled in move order, so its keys are the moves in order
+    moves = list(env.counter_players)
+    if not is_winner(env.board):
+        outcome = DRAW
+    elif env.counter_players[moves[-1]] == Player.player:
+        outcome = WIN
+    else:
+        outcome = LOSS
+    return env.went_first, moves, outcome
+
+
+def _scatter_add(counts: np.ndarray, flat_indices: np.ndarray) -> None:
+    """Add 1 to counts at each of flat_indices (which may repeat)."""
+    if len(flat_indices) < _BINCOUNT_MIN_INDICES:
+        # Touches only those entries, so it's cheaper than bincount's full size pass on a tail batch
+        np.add.at(counts.reshape(-1), flat_indices, 1)
+    else:
+        # np.add.at is unbuffered and very slow per index on older numpy
+        counts += np.bincount(flat_indices, minlength=counts.size).reshape(counts.shape)
+
+
+def _rates(counts: np.ndarray) -> np.ndarray:
+    totals = counts.sum(axis=-1, keepdims=True)
+    return np.divide(counts, totals, out=np.zeros(counts.shape), where=totals > 0)
+
+
+def _went_first_index(went_first: str) -> int:
+    assert went_first in {Player.player, Player.opponent}, f"Unknown player {went_first}"
+    return PLAYER_FIRST if went_first == Player.player else OPPONENT_FIRST
@@ -0,0 +1,199 @@
+import random
+from collections import OrderedDict
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from board_encoding import (
+    board_to_code,
+    canonical_code,
+    code_to_board,
+    flip_code,
+    has_won,
+    transform_move,
+    untransform_move,
+)
+
+
+class CachePolicy:
+    """How the cache treats a choose_move that may return different moves for the same board.
+
+    off: never cache, always call choose_move (use for bots that must stay fully stochastic)
+    first: store the first move returned for a board and replay it from then on
+    sampled: store the first n_samples moves returned for a board, then pick one of them at random.
+             This keeps roughly the same distribution over moves as the original bot
+    """
+
+    off = "off"
+    first = "first"
+    sampled = "sampled"
+
+
+class CachedChooseMove:
+    def __init__(
+        self,
+        choose_move: Callable[[List[int]], int],
+        maxsize: int = 8192,
+        policy: str = CachePolicy.first,
+        n_samples: int = 8,
+        use_symmetry: bool = True,
+    ):
+        """Memoizes the output of choose_move per board state.
+
+        Boards are keyed by their board_to_code(), canonicalized over the 8 symmetries of the board
+        if use_symmetry is True. Least recently used boards are dropped once there are more than
+        maxsize boards in the cache.
+
+        Args:
+            choose_move: function that chooses move (takes board as input)
+            maxsize: maximum number of boards to hold in the cache
+            policy: one of the CachePolicy options
+            n_samples: number of moves stored per board with CachePolicy.sampled
+            use_symmetry: whether symmetric boards share a cache entry
+        """
+        assert policy in {
+            CachePolicy.off,
+            CachePolicy.first,
+            CachePolicy.sampled,
+        }, f"policy must be 'off', 'first' or 'sampled', got {policy}"
+        assert maxsize > 0, "maxsize must be positive"
+        assert n_samples > 0, "n_samples must be positive"
+
+        self.choose_move = choose_move
+        self.maxsize = maxsize
+        self.policy = policy
+        self.n_samples = n_samples
+        self.use_symmetry = use_symmetry
+
+        # Moves are stored relative to the canonical board
+        self._cache: "OrderedDict[int, List[int]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __call__(self, board: List[int]) -> int:
+        if self.policy == CachePolicy.off:
+            self.misses += 1
+            return self.choose_move(board)
+
+        code, symmetry = self._key(board)
+        moves = self._cache.get(code)
+
+        if moves is not None and (self.policy == CachePolicy.first or len(moves) >= self.n_samples):
+            self.hits += 1
+            self._cache.move_to_end(code)
+            move = moves[0] if self.policy == CachePolicy.first else random.choice(moves)
+            return untransform_move(move, symmetry)
+
+        self.misses += 1
+        move = self.choose_move(board)
+        self._store(code, transform_move(move, symmetry))
+        return move
+
+    def _key(self, board: List[int]) -> Tuple[int, int]:
+        if self.use_symmetry:
+            return canonical_code(board)
+        return board_to_code(board), 0
+
+    def _store(self, code: int, move: int) -> None:
+        if code in self._cache:
+            self._cache[code].append(move)
+            self._cache.move_to_end(code)
+            return
+
+        self._cache[code] = [move]
+        if len(self._cache) > self.maxsize:
+            self._cache.popitem(last=False)
+
+    def prewarm(self, max_counters: int = 2, boards: Optional[Iterable[List[int]]] = None) -> int:
+        """Fill the cache by calling choose_move on every opening position.
+
+        Args:
+            max_counters: positions with at most this many counters on the board are cached
+            boards: cache these boards instead of the opening positions
+
+        Returns: the number of choose_move calls made
+        """
+        if boards is None:
+            boards = opening_positions(max_counters, use_symmetry=self.use_symmetry)
+
+        n_calls = 0
+        for board in boards:
+            n_repeats = self.n_samples if self.policy == CachePolicy.sampled else 1
+            for _ in range(n_repeats):
+                misses_before = self.misses
+                self(board)
+                n_calls += self.misses - misses_before
+        return n_calls
+
+    def cache_info(self) -> Dict[str, int]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "maxsize": self.maxsize,
+            "currsize": len(self._cache),
+        }
+
+    def cache_clear(self) -> None:
+        self._cache.clear()
+        self.hits = 0
+        self.misses = 0
+
+
+def cache_choose_move(
+    maxsize: int = 8192,
+    policy: str = CachePolicy.first,
+    n_samples: int = 8,
+    use_symmetry: bool = True,
+) -> Callable[[Callable[[List[int]], int]], CachedChooseMove]:
+    """Decorator version of CachedChooseMove.
+
+    @cache_choose_move(policy="first")
+    def choose_move(board):
+        ...
+    """
+
+    def decorator(choose_move: Callable[[List[int]], int]) -> CachedChooseMove:
+        return CachedChooseMove(
+            choose_move,
+            maxsize=maxsize,
+            policy=policy,
+            n_samples=n_samples,
+            use_symmetry=use_symmetry,
+        )
+
+    return decorator
+
+
+def opening_positions(max_counters: int = 2, use_symmetry: bool = True) -> List[List[int]]:
+    """Every board choose_move can be given that has at most max_counters counters on it.
+
+    Boards are from the perspective of the player to move (1 is the player to move). Boards where
+    the game is already over are not included.
+    """
+    # Start from the empty board and expand one counter at a time. The player to move always
+    # places a 1, then the board is flipped so the next player to move is 1 again
+    frontier: Set[int] = {0}
+    seen: Set[int] = set()
+    positions: List[List[int]] = []
+
+    for n_counters in range(max_counters + 1):
+        next_frontier: Set[int] = set()
+        for code in sorted(frontier):
+            board = code_to_board(code)
+            key = canonical_code(board)[0] if use_symmetry else code
+            if key in seen:
+                continue
+            seen.add(key)
+            positions.append(board)
+
+            if n_counters == max_counters:
+                continue
+            for position, counter in enumerate(board):
+                if counter != 0:
+                    continue
+                child = board.copy()
+                child[position] = 1
+                if has_won(child) or 0 not in child:
+                    continue
+                next_frontier.add(flip_code(board_to_code(child)))
+        frontier = next_frontier
+
+    return positions
@@ -0,0 +1,120 @@
+from typing import Iterator, List, Sequence, Tuple
+
+import numpy as np
+
+from board_encoding import WINNING_LINES
+
+# Bitboards: a board is stored as 2 9-bit integers, one for your counters and one for your
+# opponent's. Bit i is set if there is a counter on square i.
+FULL_MASK = 0b111111111
+LINE_MASKS = tuple(sum(1 << idx for idx in line) for line in WINNING_LINES)
+_BIT_VALUES = np.array([1 << idx for idx in range(9)], dtype=np.int64)
+
+
+def _build_completing_squares() -> np.ndarray:
+    """For every set of counters, the squares that would complete a line if played.
+
+    The squares are not checked to be empty, that is left to the caller.
+    """
+    table = np.zeros(FULL_MASK + 1, dtype=np.int64)
+    for counters in range(FULL_MASK + 1):
+        for line in LINE_MASKS:
+            if bin(counters & line).count("1") == 2:
+                table[counters] |= line & ~counters
+    return table
+
+
+# Indexed by a bitboard, one entry per possible set of counters
+COMPLETING_SQUARES = _build_completing_squares()
+_POPCOUNT = np.array([bin(mask).count("1") for mask in range(FULL_MASK + 1)], dtype=np.int8)
+
+
+def board_to_bitboards(board: Sequence[int]) -> Tuple[int, int]:
+    """Convert a choose_move() board (0, 1, -1) into bitboards.
+
+    Returns:
+        own: your counters
+        opp: your opponent's counters
+    """
+    own = opp = 0
+    for idx, counter in enumerate(board):
+        if counter == 1:
+            own |= 1 << idx
+        elif counter == -1:
+            opp |= 1 << idx
+    return own, opp
+
+
+def iter_moves(moves: int) -> Iterator[int]:
+    """Iterate over the squares set in a move bitmask, lowest square first."""
+    while moves:
+        lowest = moves & -moves
+        yield lowest.bit_length() - 1
+        moves ^= lowest
+
+
+def moves_to_list(moves: int) -> List[int]:
+    return list(iter_moves(moves))
+
+
+def legal_moves(own: int, opp: int) -> int:
+    """Bitmask of the empty squares."""
+    return FULL_MASK & ~(own | opp)
+
+
+def winning_moves(own: int, opp: int) -> int:
+    """Bitmask of the moves that win the game immediately."""
+    return int(COMPLETING_SQUARES[own]) & legal_moves(own, opp)
+
+
+def blocking_moves(own: int, opp: int) -> int:
+    """Bitmask of the moves that stop your opponent winning on their next move."""
+    return int(COMPLETING_SQUARES[opp]) & legal_moves(own, opp)
+
+
+def fork_moves(own: int, opp: int) -> int:
+    """Bitmask of the moves that create 2 or more threats to win at once."""
+    forks = 0
+    for move in iter_moves(legal_moves(own, opp)):
+        bit = 1 << move
+        threats = winning_moves(own | bit, opp)
+        if _POPCOUNT[threats] >= 2:
+            forks |= bit
+    return forks
+
+
+####################### BATCHED VERSIONS #############################
+
+
+def batch_board_to_bitboards(boards: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Vectorised board_to_bitboards() for an (n, 9) array of boards."""
+    boards = np.asarray(boards)
+    return (boards == 1) @ _BIT_VALUES, (boards == -1) @ _BIT_VALUES
+
+
+def batch_legal_moves(own: np.ndarray, opp: np.ndarray) -> np.ndarray:
+    return FULL_MASK & ~(own | opp)
+
+
+def batch_winning_moves(own: np.ndarray, opp: np.ndarray) -> np.ndarray:
+    return COMPLETING_SQUARES[own] & batch_legal_moves(own, opp)
+
+
+def batch_blocking_moves(own: np.ndarray, opp: np.ndarray) -> np.ndarray:
+    return COMPLETING_SQUARES[opp] & batch_legal_moves(own, opp)
+
+
+def batch_fork_moves(own: np.ndarray, opp: np.ndarray) -> np.ndarray:
+    legal = batch_legal_moves(own, opp)
+    forks = np.zeros_like(legal)
+    for bit in _BIT_VALUES:
+        threats = batch_winning_moves(own | bit, opp)
+        is_fork = ((legal & bit) != 0) & (_POPCOUNT[threats] >= 2)
+        forks[is_fork] |= bit
+    return forks
+
+
+def moves_to_array(moves: np.ndarray) -> np.ndarray:
+    """Convert an (n,) array of move bitmasks to an (n, 9) bool array, e.g. for legal move
+    masking."""
+    return (np.asarray(moves)[..., None] & _BIT_VALUES) != 0
@@ -0,0 +1,165 @@
+from pathlib import Path
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+HERE = Path(__file__).parent.resolve()
+
+
+class PolicyValueNetwork:
+    def __init__(
+        self,
+        hidden_sizes: Sequence[int] = (64, 64),
+        batch_capacity: int = 1024,
+        seed: Optional[int] = None,
+    ):
+        """Small MLP that maps a choose_move() board (0, 1, -1) to move probabilities and a value.
+
+        Weights and activation buffers are allocated once up front. predict() reuses the
+        activation buffers on every call, growing them only if it is given a bigger batch than it
+        has seen before.
+
+        Args:
+            hidden_sizes: number of units in each hidden layer
+            batch_capacity: number of boards the activation buffers initially hold
+            seed: seed for the weight initialisation
+        """
+        rng = np.random.default_rng(seed)
+        sizes = [9, *hidden_sizes]
+
+        self.weights: List[np.ndarray] = []
+        self.biases: List[np.ndarray] = []
+        for fan_in, fan_out in zip(sizes[:-1], sizes[1:]):
+            # He initialisation as the hidden layers are ReLU
+            self.weights.append(
+                (rng.standard_normal((fan_in, fan_out)) * np.sqrt(2 / fan_in)).astype(np.float32)
+            )
+            self.biases.append(np.zeros(fan_out, dtype=np.float32))
+
+        # Policy head (9 move logits) and value head (1 output, squashed by tanh)
+        self.policy_weights = (rng.standard_normal((sizes[-1], 9)) / np.sqrt(sizes[-1])).astype(
+            np.float32
+        )
+        self.policy_bias = np.zeros(9, dtype=np.float32)
+        self.value_weights = (rng.standard_normal((sizes[-1], 1)) / np.sqrt(sizes[-1])).astype(
+            np.float32
+        )
+        self.value_bias = np.zeros(1, dtype=np.float32)
+
+        self._allocate_buffers(batch_capacity)
+
+    @property
+    def hidden_sizes(self) -> Tuple[int, ...]:
+        return tuple(bias.shape[0] for bias in self.biases)
+
+    def _allocate_buffers(self, batch_capacity: int) -> None:
+        self.batch_capacity = batch_capacity
+        self._inputs = np.empty((batch_capacity, 9), dtype=np.float32)
+        self._hidden = [
+            np.empty((batch_capacity, size), dtype=np.float32) for size in self.hidden_sizes
+        ]
+        self._logits = np.empty((batch_capacity, 9), dtype=np.float32)
+        self._values = np.empty((batch_capacity, 1), dtype=np.float32)
+
+    def predict(self, boards: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Batched forward pass.
+
+        Args:
+            boards: (n, 9) array of choose_move() boards, or a single board
+
+        Returns:
+            probs: (n, 9) move probabilities. Squares that are already taken get probability 0,
+                so boards with no legal move get all zero probabilities
+            values: (n,) predicted value of each board for the player to move, between -1 and 1
+        """
+        boards = np.asarray(boards)
+        if boards.ndim == 1:
+            boards = boards[None, :]
+        n_boards = boards.shape[0]
+        if n_boards > self.batch_capacity:
+            self._allocate_buffers(max(n_boards, 2 * self.batch_capacity))
+
+        activations = self._inputs[:n_boards]
+        activations[...] = boards
+        legal = activations == 0
+
+        for weights, bias, buffer in zip(self.weights, self.biases, self._hidden):
+            out = buffer[:n_boards]
+            np.matmul(activations, weights, out=out)
+            out += bias
+            np.maximum(out, 0, out=out)
+            activations = out
+
+        logits = self._logits[:n_boards]
+        np.matmul(activations, self.policy_weights, out=logits)
+        logits += self.policy_bias
+        # Legal move masking, then a numerically stable softmax over the legal moves. Boards with no
+        # empty square would be all -inf, so they get all zero probabilities instead of NaN
+        has_legal_move = legal.any(axis=1)
+        logits[~legal] = -np.inf
+        logits[~has_legal_move] = 0
+        logits -= logits.max(axis=1, keepdims=True)
+        np.exp(logits, out=logits)
+        logits[~has_legal_move] = 0
+        totals = logits.sum(axis=1, keepdims=True)
+        np.divide(logits, totals, out=logits, where=totals > 0)
+
+        values = self._values[:n_boards]
+        np.matmul(activations, self.value_weights, out=values)
+        values += self.value_bias
+        np.tanh(values, out=values)
+
+        # Copy out of the buffers so the next predict() call doesn't overwrite the results
+        return logits.copy(), values[:, 0].copy()
+
+    def choose_move(self, board: List[int]) -> int:
+        """Picks the legal move with the highest probability.
+
+        Can be used directly as a choose_move() function.
+        """
+        probs, _ = self.predict(np.asarray(board))
+        return int(np.argmax(probs[0]))
+
+    def __call__(self, board: List[int]) -> int:
+        return self.choose_move(board)
+
+    def save(self, path: Path) -> None:
+        arrays = {
+            "policy_weights": self.policy_weights,
+            "policy_bias": self.policy_bias,
+            "value_weights": self.value_weights,
+            "value_bias": self.value_bias,
+        }
+        for layer, (weights, bias) in enumerate(zip(self.weights, self.biases)):
+            arrays[f"weights_{layer}"] = weights
+            arrays[f"bias_{layer}"] = bias
+        # np.savez appends .npz if it isn't there, so write to a file object to keep the path
+        with open(path, "wb") as f:
+            np.savez(f, **arrays)
+
+    @classmethod
+    def load(cls, path: Path, batch_capacity: int = 1024) -> "PolicyValueNetwork":
+        with np.load(path) as arrays:
+            n_layers = sum(name.startswith("weights_") for name in arrays.files)
+            network = cls.__new__(cls)
+            network.weights = [arrays[f"weights_{layer}"] for layer in range(n_layers)]
+            network.biases = [arrays[f"bias_{layer}"] for layer in range(n_layers)]
+            network.policy_weights = arrays["policy_weights"]
+            network.policy_bias = arrays["policy_bias"]
+            network.value_weights = arrays["value_weights"]
+            network.value_bias = arrays["value_bias"]
+        network._allocate_buffers(batch_capacity)
+        return network
+
+
+def save_network(network: PolicyValueNetwork, team_name: str, umbrella: Path = HERE) -> None:
+    assert isinstance(
+        network, PolicyValueNetwork
+    ), f"Expected a PolicyValueNetwork, but got: {type(network)}"
+    assert "/" not in team_name, "Invalid TEAM_NAME. '/' are illegal in TEAM_NAME"
+
+    network.save(Path(umbrella) / f"network_{team_name}.npz")
+
+
+def load_network(team_name: str, umbrella: Path = HERE) -> PolicyValueNetwork:
+    return PolicyValueNetwork.load(Path(umbrella) / f"network_{team_name}.npz")
@@ -0,0 +1,135 @@
+import os
+from pathlib import Path
+from typing import Dict, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from board_encoding import N_BOARD_CODES, board_to_code
+
+HERE = Path(__file__).parent.resolve()
+
+
+class TableKind:
+    """What a packed policy table holds.
+
+    moves: a position to play (int in range(9)) per board, stored as int8
+    values: a number per board, e.g. a state value. Stored as int64 if every value is an int,
+            otherwise float64
+    """
+
+    moves = "moves"
+    values = "values"
+
+
+# Tables already attached by this process, keyed by resolved path, so repeated load_policy() calls
+# only cost an os.stat()
+_ATTACHED: Dict[str, "PolicyTable"] = {}
+
+
+class PolicyTable:
+    """Read-only view of a packed policy dictionary.
+
+    The table is a dense array with one entry per board code, memory-mapped from disk. Every process
+    that attaches to the same file shares the same physical pages through the OS page cache, so
+    only a single copy is resident no matter how many workers are serving the team.
+
+    Each entry has a "present" flag alongside its "value", so every value a dictionary can hold
+    (including -1 and 0) survives packing.
+    """
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+        # Stat before mapping: if the file is replaced in between, the stale id just causes an extra
+        # attach on the next load_policy() rather than missing the new table
+        self.file_id = _file_id(self.path)
+        self.table: np.ndarray = np.load(self.path, mmap_mode="r")
+        assert self.table.shape == (N_BOARD_CODES,) and self.table.dtype.names == (
+            "present",
+            "value",
+        ), f"{self.path} is not a packed policy table"
+
+    @property
+    def kind(self) -> str:
+        return TableKind.moves if self.table.dtype["value"] == np.int8 else TableKind.values
+
+    def __getitem__(self, board: Sequence):
+        present, value = self.table[board_to_code(board)]
+        if not present:
+            raise KeyError(board)
+        return value.item()
+
+    def __contains__(self, board: Sequence) -> bool:
+        return bool(self.table["present"][board_to_code(board)])
+
+    def get(self, board: Sequence, default=None):
+        present, value = self.table[board_to_code(board)]
+        return value.item() if present else default
+
+    def __len__(self) -> int:
+        return int(np.count_nonzero(self.table["present"]))
+
+
+def pack_policy(
+    my_dict: Dict, team_name: str, umbrella: Path = HERE, kind: Optional[str] = None
+) -> Path:
+    """Pack a policy dictionary into a file that worker processes can attach to with load_policy().
+
+    Keys must be boards, either in the choose_move() format (0, 1, -1) or the Cell format
+    (" ", "X", "O"). Values must be either moves (ints in range(9)) or numbers such as state values.
+
+    Args:
+        my_dict: the dictionary to pack, e.g. the output of load_dictionary()
+        team_name: the team whose policy this is
+        umbrella: directory to write the table into
+        kind: one of the TableKind options. By default TableKind.moves if every value is an int
+              in range(9), otherwise TableKind.values
+
+    Returns: path of the packed table
+    """
+    assert isinstance(my_dict, dict), f"Policy should be a dict, but got: {type(my_dict)}"
+    assert "/" not in team_name, "Invalid TEAM_NAME. '/' are illegal in TEAM_NAME"
+
+    all_ints = all(isinstance(value, (int, np.integer)) for value in my_dict.values())
+    all_moves = all_ints and all(value in range(9) for value in my_dict.values())
+    if kind is None:
+        kind = TableKind.moves if all_moves else TableKind.values
+    assert kind in {TableKind.moves, TableKind.values}, f"Unknown table kind: {kind}"
+
+    if kind == TableKind.moves:
+        assert all_moves, "Every value of a moves table must be an int in range(9)"
+        value_dtype = np.int8
+    else:
+        value_dtype = np.int64 if all_ints else np.float64
+
+    table = np.zeros(N_BOARD_CODES, dtype=[("present", np.bool_), ("value", value_dtype)])
+    for board, value in my_dict.items():
+        table[board_to_code(board)] = (True, value)
+
+    policy_path = Path(umbrella) / f"policy_{team_name}.npy"
+    # Write then rename so workers never attach to a half written table
+    tmp_path = policy_path.with_suffix(".tmp.npy")
+    np.save(tmp_path, table)
+    os.replace(tmp_path, policy_path)
+    _ATTACHED.pop(str(policy_path.resolve()), None)
+    return policy_path
+
+
+def load_policy(team_name: str, umbrella: Path = HERE) -> PolicyTable:
+    """Attach read-only to a table written by pack_policy().
+
+    Drop-in replacement for load_dictionary() for lookups: table[board] and table.get(board) work
+    the same way as on the original dictionary.
+
+    The table is attached again if pack_policy() has replaced the file since it was last attached,
+    including from another process, so long-lived workers pick up new policies.
+    """
+    policy_path = (Path(umbrella) / f"policy_{team_name}.npy").resolve()
+    table = _ATTACHED.get(str(policy_path))
+    if table is None or table.file_id != _file_id(policy_path):
+        table = _ATTACHED[str(policy_path)] = PolicyTable(policy_path)
+    return table
+
+
+def _file_id(path: Path) -> Tuple[int, int]:
+    stat = os.stat(path)
+    return stat.st_ino, stat.st_mtime_ns
@@ -0,0 +1,299 @@
+import math
+import os
+import signal
+import sqlite3
+import threading
+from concurrent.futures import FIRST_COMPLETED, Executor, Future, ProcessPoolExecutor, wait
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Set, Tuple, Union
+
+from game_mechanics import WildTictactoeEnv, convert_board_to_regular_ttt
+
+HERE = Path(__file__).parent.resolve()
+
+# Glicko rating system constants. A new bot starts on INITIAL_RATING with the maximum uncertainty
+# (rating deviation). The deviation never drops below MIN_RD so ratings can still move if a bot
+# is updated
+INITIAL_RATING = 1500.0
+INITIAL_RD = 350.0
+MIN_RD = 30.0
+_Q = math.log(10) / 400
+
+# Seconds between repeat timeout signals for a bot that has run out of time
+_TIMEOUT_REPEAT = 0.1
+
+
+class Rating:
+    def __init__(self, rating: float = INITIAL_RATING, rd: float = INITIAL_RD, games: int = 0):
+        self.rating = rating
+        self.rd = rd
+        self.games = games
+
+    def __repr__(self) -> str:
+        return f"Rating(rating={self.rating:.1f}, rd={self.rd:.1f}, games={self.games})"
+
+
+def _g(rd: float) -> float:
+    return 1 / math.sqrt(1 + 3 * _Q**2 * rd**2 / math.pi**2)
+
+
+def expected_score(player: Rating, opponent: Rating) -> float:
+    """Probability player beats opponent (draws count as half a win)."""
+    return 1 / (1 + 10 ** (-_g(opponent.rd) * (player.rating - opponent.rating) / 400))
+
+
+def update_rating(player: Rating, opponent: Rating, score: float) -> Rating:
+    """Glicko update of player's rating after a single game against opponent.
+
+    Args:
+        player: rating before the game
+        opponent: opponent's rating before the game
+        score: 1 for a win, 0.5 for a draw and 0 for a loss
+    """
+    g = _g(opponent.rd)
+    expected = expected_score(player, opponent)
+    d_squared = 1 / (_Q**2 * g**2 * expected * (1 - expected))
+    precision = 1 / player.rd**2 + 1 / d_squared
+
+    return Rating(
+        rating=player.rating + _Q / precision * g * (score - expected),
+        rd=max(math.sqrt(1 / precision), MIN_RD),
+        games=player.games + 1,
+    )
+
+
+def choose_pairings(ratings: Dict[str, Rating], n_pairs: int) -> List[Tuple[str, str]]:
+    """Pick the most informative games to play next.
+
+    The most uncertain bots are paired first, each with the opponent whose rating is closest once
+    both bots' uncertainty is taken into account. Closely matched games tell us the most about the
+    ranking, lopsided ones tell us very little. Each bot appears in at most one pairing.
+    """
+    unpaired = sorted(ratings, key=lambda name: ratings[name].rd, reverse=True)
+    pairings = []
+    while len(unpaired) >= 2 and len(pairings) < n_pairs:
+        player = unpaired.pop(0)
+        opponent = min(
+            unpaired,
+            key=lambda name: abs(ratings[player].rating - ratings[name].rating)
+            / math.sqrt(ratings[player].rd ** 2 + ratings[name].rd ** 2),
+        )
+        unpaired.remove(opponent)
+        pairings.append((player, opponent))
+    return pairings
+
+
+class _Forfeit(Exception):
+    """Raised when a bot errors, plays an illegal move or runs out of time, ending the game as a
+    loss for it."""
+
+    def __init__(self, score: float):
+        super().__init__()
+        self.score = score
+
+
+class _MoveTimeout(BaseException):
+    """Raised inside a bot that is taking too long. A BaseException so `except Exception` in the
+    bot doesn't swallow it."""
+
+
+def _raise_move_timeout(signum, frame) -> None:
+    raise _MoveTimeout()
+
+
+def _forfeit_on_error(
+    choose_move: Callable[[List[int]], int],
+    score_if_forfeit: float,
+    move_timeout: Optional[float],
+) -> Callable[[List[int]], int]:
+    def checked_choose_move(board: List[int]) -> int:
+        # Signals can only be handled in the main thread, which is where ProcessPoolExecutor
+        # workers play their games
+        timed = move_timeout is not None and threading.current_thread() is threading.main_thread()
+        if timed:
+            previous_handler = signal.signal(signal.SIGALRM, _raise_move_timeout)
+            # Keep firing in case the bot catches the first one
+            signal.setitimer(signal.ITIMER_REAL, move_timeout, _TIMEOUT_REPEAT)
+        try:
+            try:
+                move = choose_move(board)
+            finally:
+                if timed:
+                    signal.setitimer(signal.ITIMER_REAL, 0)
+                    signal.signal(signal.SIGALRM, previous_handler)
+        except _MoveTimeout:
+            raise _Forfeit(score_if_forfeit)
+        except Exception as e:
+            raise _Forfeit(score_if_forfeit) from e
+
+        # Same checks as check_action_valid(), but without asserting
+        if not (isinstance(move, int) and move in range(9) and board[move] == 0):
+            raise _Forfeit(score_if_forfeit)
+        return move
+
+    return checked_choose_move
+
+
+def play_game(
+    your_choose_move: Callable[[List[int]], int],
+    opponent_choose_move: Callable[[List[int]], int],
+    move_timeout: Optional[float] = 1.0,
+) -> float:
+    """Play a single game without rendering, like play_ttt_game(). Who goes first is chosen at
+    random.
+
+    A bot that raises an exception, plays an illegal move or takes longer than move_timeout seconds
+    to choose a move forfeits the game. The timeout is only enforced when the game is played in
+    the main thread of a process, e.g. in a ProcessPoolExecutor worker.
+
+    Returns: 1 if your_choose_move wins, 0.5 for a draw and 0 if opponent_choose_move wins
+    """
+    your_choose_move = _forfeit_on_error(your_choose_move, 0, move_timeout)
+    game = WildTictactoeEnv(_forfeit_on_error(opponent_choose_move, 1, move_timeout))
+    try:
+        state, reward, done, info = game.reset()
+        total_return = reward
+        while not done:
+            action = your_choose_move(convert_board_to_regular_ttt(state))
+            state, reward, done, info = game.step(action)
+            total_return += reward
+    except _Forfeit as forfeit:
+        return forfeit.score
+    return (total_return + 1) / 2
+
+
+class RatingDatabase:
+    def __init__(self, path: Union[str, Path]):
+        """Persistent store of every bot's rating and the results of every game played."""
+        self.connection = sqlite3.connect(str(path))
+        with self.connection:
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS ratings "
+                "(name TEXT PRIMARY KEY, rating REAL, rd REAL, games INTEGER)"
+            )
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS games "
+                "(id INTEGER PRIMARY KEY, player TEXT, opponent TEXT, score REAL)"
+            )
+
+    def get(self, name: str) -> Rating:
+        row = self.connection.execute(
+            "SELECT rating, rd, games FROM ratings WHERE name = ?", (name,)
+        ).fetchone()
+        return Rating() if row is None else Rating(*row)
+
+    def record_game(self, player: str, opponent: str, score: float) -> Tuple[Rating, Rating]:
+        """Store the result of a game and update both bots' ratings.
+
+        Returns: the new ratings of player and opponent
+        """
+        player_rating, opponent_rating = self.get(player), self.get(opponent)
+        new_player_rating = update_rating(player_rating, opponent_rating, score)
+        new_opponent_rating = update_rating(opponent_rating, player_rating, 1 - score)
+
+        with self.connection:
+            self.connection.execute(
+                "INSERT INTO games (player, opponent, score) VALUES (?, ?, ?)",
+                (player, opponent, score),
+            )
+            for name, rating in [(player, new_player_rating), (opponent, new_opponent_rating)]:
+                self.connection.execute(
+                    "INSERT OR REPLACE INTO ratings (name, rating, rd, games) VALUES (?, ?, ?, ?)",
+                    (name, rating.rating, rating.rd, rating.games),
+                )
+        return new_player_rating, new_opponent_rating
+
+    def n_games(self) -> int:
+        return self.connection.execute("SELECT COUNT(*) FROM games").fetchone()[0]
+
+    def close(self) -> None:
+        self.connection.close()
+
+
+class RatingLadder:
+    def __init__(
+        self,
+        bots: Dict[str, Callable[[List[int]], int]],
+        db_path: Union[str, Path] = HERE / "ratings.sqlite",
+        executor: Optional[Executor] = None,
+        max_workers: Optional[int] = None,
+        move_timeout: Optional[float] = 1.0,
+    ):
+        """Continuously rates bots by playing informative pairings in a pool of workers.
+
+        Args:
+            bots: team name -> choose_move function. With the default process pool these must be
+                  picklable, i.e. defined at the top level of a module
+            db_path: SQLite file the ratings are stored in. Ratings carry over between runs
+            executor: pool to play games in. By default a ProcessPoolExecutor
+            max_workers: maximum number of games played at once, defaults to the number of CPUs
+            move_timeout: seconds a bot has to choose each move before it forfeits the game. Only
+                  enforced in process pools, as a thread can't interrupt a bot that never returns
+        """
+        assert len(bots) >= 2, "Need at least 2 bots to play games"
+        self.bots = bots
+        self.database = RatingDatabase(db_path)
+        self.executor = executor
+        self.max_workers = max_workers
+        self.move_timeout = move_timeout
+
+    def ratings(self) -> Dict[str, Rating]:
+        return {name: self.database.get(name) for name in self.bots}
+
+    def run(self, n_games: int) -> List[Tuple[str, Rating]]:
+        """Play n_games, updating the ratings as each result comes in.
+
+        Bots are only paired once they have finished their previous game, so each pairing is chosen
+        using the most up-to-date ratings.
+
+        Returns: the leaderboard after the games are played
+        """
+        executor = self.executor or ProcessPoolExecutor(max_workers=self.max_workers)
+        in_flight: Dict[Future, Tuple[str, str]] = {}
+        n_submitted = 0
+        n_slots = self.max_workers or os.cpu_count() or 1
+
+        try:
+            while n_submitted < n_games or in_flight:
+                busy: Set[str] = {name for pairing in in_flight.values() for name in pairing}
+                idle_ratings = {
+                    name: rating for name, rating in self.ratings().items() if name not in busy
+                }
+                n_pairs = min(n_slots - len(in_flight), n_games - n_submitted)
+                for player, opponent in choose_pairings(idle_ratings, n_pairs):
+                    future = executor.submit(
+                        play_game, self.bots[player], self.bots[opponent], self.move_timeout
+                    )
+                    in_flight[future] = (player, opponent)
+                    n_submitted += 1
+
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    player, opponent = in_flight.pop(future)
+                    self.database.record_game(player, opponent, future.result())
+        finally:
+            if self.executor is None:
+                executor.shutdown()
+
+        return self.leaderboard()
+
+    def close(self) -> None:
+        self.database.close()
+
+    def __enter__(self) -> "RatingLadder":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def leaderboard(self) -> List[Tuple[str, Rating]]:
+        """Bots sorted from best to worst.
+
+        Bots are ranked by a conservative estimate of their rating (rating - 2 * rd), so a bot that
+        got lucky in a few games doesn't top the table.
+        """
+        return sorted(
+            self.ratings().items(),
+            key=lambda item: item[1].rating - 2 * item[1].rd,
+            reverse=True,
+        )
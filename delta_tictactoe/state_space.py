@@ -0,0 +1,183 @@
+from pathlib import Path
+from typing import Dict, Iterator, List, Union
+
+import numpy as np
+
+from board_encoding import (
+    N_BOARD_CODES,
+    POWERS_OF_3,
+    SYMMETRIES,
+    WINNING_LINES,
+    boards_to_codes,
+    codes_to_boards,
+    flip_code,
+)
+
+# Every board is from the perspective of the player to move, like the boards given to
+# choose_move(). 1 is the player to move, -1 is the player who just moved.
+UNREACHABLE = -2
+
+# Board for every code, shape (3**9, 9)
+_ALL_BOARDS = codes_to_boards(np.arange(N_BOARD_CODES))
+# The player who just moved has 3 in a row, so the player to move has lost
+_LOST = np.any(np.all(_ALL_BOARDS[:, WINNING_LINES] == -1, axis=2), axis=1)
+_FULL = np.all(_ALL_BOARDS != 0, axis=1)
+
+
+def reachable_codes() -> List[np.ndarray]:
+    """Codes of every position reachable from get_empty_board(), grouped by number of counters.
+
+    Returns: list where element n is a sorted array of the codes with n counters on the board
+    """
+    plies = [np.array([0])]
+    while True:
+        children = set()
+        for code in plies[-1]:
+            if _LOST[code] or _FULL[code]:
+                continue
+            for position in np.flatnonzero(_ALL_BOARDS[code] == 0):
+                # Place the mover's counter then flip so the next player to move is 1
+                children.add(flip_code(int(code) + POWERS_OF_3[position]))
+        if not children:
+            return plies
+        plies.append(np.array(sorted(children)))
+
+
+def solve() -> np.ndarray:
+    """Perfect-play value of every board code for the player to move.
+
+    Returns: int8 array of length 3**9. 1 is a win, 0 a draw and -1 a loss with perfect play from
+        both players. Codes that can't be reached from the empty board are UNREACHABLE
+    """
+    values = np.full(N_BOARD_CODES, UNREACHABLE, dtype=np.int8)
+    for _ in _solve_plies(values):
+        pass
+    return values
+
+
+def _solve_plies(values: np.ndarray) -> Iterator[np.ndarray]:
+    """Fill in values one group of boards at a time, yielding each group's codes once it is solved.
+
+    Works backwards from the fullest boards, so every child is solved before its parent.
+    """
+    for codes in reversed(reachable_codes()):
+        for code in codes:
+            values[code] = _solve_one(int(code), values)
+        yield codes
+
+
+def _solve_one(code: int, values: np.ndarray) -> int:
+    if _LOST[code]:
+        return -1
+    if _FULL[code]:
+        return 0
+    return max(-values[child] for child in _child_codes(code))
+
+
+def _child_codes(code: int) -> List[int]:
+    return [
+        flip_code(code + POWERS_OF_3[position])
+        for position in np.flatnonzero(_ALL_BOARDS[code] == 0)
+    ]
+
+
+def enumerate_positions(
+    symmetry: bool = False, include_terminal: bool = True
+) -> Dict[str, np.ndarray]:
+    """Every reachable position with labels for supervised training.
+
+    Args:
+        symmetry: only keep one position from each group of symmetric positions
+        include_terminal: whether to include positions where the game is over
+
+    Returns: dictionary of contiguous arrays, all with the same first dimension:
+        codes: (n,) int32 board codes, see board_encoding.board_to_code()
+        boards: (n, 9) int8 boards, 1 is the player to move
+        legal: (n, 9) bool, legal moves. All False if the game is over
+        values: (n,) int8 perfect-play value for the player to move
+        optimal: (n, 9) bool, every move that achieves the perfect-play value
+        best_moves: (n,) int8 one optimal move, -1 if the game is over
+    """
+    values = solve()
+    codes = _select(np.concatenate(reachable_codes()), symmetry, include_terminal)
+    return _label(codes, values)
+
+
+def iter_position_chunks(
+    chunk_size: int = 1024, symmetry: bool = False, include_terminal: bool = True
+) -> Iterator[Dict[str, np.ndarray]]:
+    """Streaming version of enumerate_positions(), yields the same arrays chunk_size rows at a
+    time (the last chunk may be smaller).
+
+    Positions are labelled and yielded as soon as the solver reaches them, fullest boards first, so
+    the full dataset is never built in memory. Chunks come out in a different order to
+    enumerate_positions().
+    """
+    values = np.full(N_BOARD_CODES, UNREACHABLE, dtype=np.int8)
+    pending = np.zeros(0, dtype=np.int64)
+    for codes in _solve_plies(values):
+        # Symmetric boards have the same number of counters, so deduplicating within a group of
+        # boards is the same as deduplicating across all of them
+        pending = np.concatenate([pending, _select(codes, symmetry, include_terminal)])
+        while len(pending) >= chunk_size:
+            yield _label(pending[:chunk_size], values)
+            pending = pending[chunk_size:]
+    if len(pending):
+        yield _label(pending, values)
+
+
+def _select(codes: np.ndarray, symmetry: bool, include_terminal: bool) -> np.ndarray:
+    if symmetry:
+        codes = np.unique(_canonical_codes(codes))
+    if not include_terminal:
+        codes = codes[~(_LOST[codes] | _FULL[codes])]
+    return codes
+
+
+def _label(codes: np.ndarray, values: np.ndarray) -> Dict[str, np.ndarray]:
+    """Training arrays for codes. Every child of every code must already be solved in values."""
+    boards = _ALL_BOARDS[codes]
+    terminal = _LOST[codes] | _FULL[codes]
+    legal = (boards == 0) & ~terminal[:, None]
+
+    # Value of each move for the player to move is minus the value of the resulting position
+    child_codes = np.zeros(boards.shape, dtype=np.int64)
+    child_codes[legal] = (codes[:, None] + np.array(POWERS_OF_3))[legal]
+    child_codes[legal] = _flip_codes(child_codes[legal])
+    move_values = np.where(legal, -values[child_codes].astype(np.int8), -2)
+    optimal = legal & (move_values == values[codes][:, None])
+
+    best_moves = np.where(terminal, -1, np.argmax(optimal, axis=1)).astype(np.int8)
+
+    return {
+        "codes": codes.astype(np.int32),
+        "boards": np.ascontiguousarray(boards),
+        "legal": legal,
+        "values": values[codes],
+        "optimal": optimal,
+        "best_moves": best_moves,
+    }
+
+
+def export_dataset(
+    path: Union[str, Path], symmetry: bool = False, include_terminal: bool = True
+) -> Path:
+    """Write enumerate_positions() to a compressed .npz file.
+
+    Load it back with np.load(path).
+    """
+    path = Path(path)
+    positions = enumerate_positions(symmetry=symmetry, include_terminal=include_terminal)
+    with open(path, "wb") as f:
+        np.savez_compressed(f, **positions)
+    return path
+
+
+def _flip_codes(codes: np.ndarray) -> np.ndarray:
+    boards = -_ALL_BOARDS[codes]
+    return boards_to_codes(boards)
+
+
+def _canonical_codes(codes: np.ndarray) -> np.ndarray:
+    boards = _ALL_BOARDS[codes]
+    return np.min([boards_to_codes(boards[:, perm]) for perm in SYMMETRIES], axis=0)
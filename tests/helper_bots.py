@@ -0,0 +1,6 @@
+from typing import List
+
+
+def choose_first_empty(board: List[int]) -> int:
+    """Deterministic bot for tests, plays the lowest numbered empty square."""
+    return board.index(0)
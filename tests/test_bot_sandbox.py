@@ -0,0 +1,181 @@
+import os
+import time
+from typing import List
+
+import pytest
+from bot_sandbox import BotCrashed, BotError, BotHost, BotPool, BotTimeout
+from helper_bots import choose_first_empty
+
+MAIN_PY = """
+TEAM_NAME = "sandboxed"
+
+
+def choose_move(board):
+    return board.index(0)
+"""
+
+# Well above any fd the test process opens itself
+HIGH_FD = 1000
+
+
+def choose_worker_pid(board: List[int]) -> int:
+    return os.getpid() % 9
+
+
+def choose_slowly(board: List[int]) -> int:
+    if board[0] == 1:
+        time.sleep(10)
+    return board.index(0)
+
+
+def choose_and_crash(board: List[int]) -> int:
+    if board[0] == 1:
+        os._exit(1)
+    return board.index(0)
+
+
+def choose_invalid(board: List[int]) -> int:
+    if board[0] == 1:
+        raise ValueError("Bug in the bot")
+    return 9
+
+
+def spin_then_choose(board: List[int]) -> int:
+    """Uses about 0.3s of CPU time every move, or never stops if the top left is taken."""
+    start = time.process_time()
+    while time.process_time() - start < 0.3 or board[0] == 1:
+        pass
+    return board.index(0)
+
+
+def choose_greedily(board: List[int]) -> int:
+    if board[0] == 1:
+        hog = bytearray(4 * 1024**3)  # noqa: F841
+    return board.index(0)
+
+
+def count_open_fds(board: List[int]) -> int:
+    """Number of fds open in the worker besides stdin, stdout and stderr."""
+    n_open = 0
+    for fd in range(3, 256):
+        try:
+            os.fstat(fd)
+            n_open += 1
+        except OSError:
+            pass
+    return min(n_open, 8)
+
+
+def choose_high_fd_if_open(board: List[int]) -> int:
+    try:
+        os.fstat(HIGH_FD)
+        return 1
+    except OSError:
+        return 0
+
+
+def tamper_with_other_pipes(board: List[int]) -> int:
+    """Try to write a board into, and read a reply from, every fd the worker didn't create."""
+    for fd in range(3, 256):
+        try:
+            os.write(fd, bytes(9))
+        except OSError:
+            pass
+        try:
+            os.set_blocking(fd, False)
+            os.read(fd, 1)
+        except OSError:
+            pass
+    return 0
+
+
+def test_moves_come_back_from_worker():
+    with BotHost(choose_first_empty) as host:
+        assert host([1, -1, 0, 0, 0, 0, 0, 0, 0]) == 2
+        assert host([0] * 9) == 0
+
+
+def test_worker_is_reused():
+    with BotHost(choose_worker_pid) as host:
+        moves = {host([0] * 9) for _ in range(20)}
+        assert moves == {host.process.pid % 9}
+        assert host.process.pid != os.getpid()
+
+
+def test_loads_main_py(tmp_path):
+    (tmp_path / "main.py").write_text(MAIN_PY)
+    with BotHost(tmp_path / "main.py") as host:
+        assert host([1, 0, 0, 0, 0, 0, 0, 0, 0]) == 1
+
+
+def test_timeout_restarts_worker():
+    with BotHost(choose_slowly, move_timeout=0.2) as host:
+        with pytest.raises(BotTimeout):
+            host([1, 0, 0, 0, 0, 0, 0, 0, 0])
+        assert host.n_restarts == 1
+        assert host([0] * 9) == 0
+
+
+def test_crash_restarts_worker():
+    with BotHost(choose_and_crash) as host:
+        with pytest.raises(BotCrashed):
+            host([1, 0, 0, 0, 0, 0, 0, 0, 0])
+        assert host([0] * 9) == 0
+
+
+def test_bot_errors_keep_worker():
+    with BotHost(choose_invalid) as host:
+        pid = host.process.pid
+        with pytest.raises(BotError):
+            host([1, 0, 0, 0, 0, 0, 0, 0, 0])
+        with pytest.raises(BotError):
+            host([0] * 9)
+        assert host.process.pid == pid
+
+
+def test_memory_limit():
+    with BotHost(choose_greedily, memory_limit_mb=2048) as host:
+        with pytest.raises(BotError):
+            host([1, 0, 0, 0, 0, 0, 0, 0, 0])
+        assert host([0] * 9) == 0
+
+
+def test_cpu_time_limit_is_per_move():
+    with BotHost(spin_then_choose, move_timeout=5, move_cpu_time_limit=1) as host:
+        # Far more CPU time in total than one move's budget
+        for _ in range(10):
+            assert host([0] * 9) == 0
+        assert host.n_restarts == 0
+
+        with pytest.raises(BotCrashed):
+            host([1, 0, 0, 0, 0, 0, 0, 0, 0])
+        assert host([0] * 9) == 0
+
+
+def test_pool_workers_only_see_their_own_pipes():
+    with BotPool(
+        {"a": choose_first_empty, "b": count_open_fds, "c": tamper_with_other_pipes}
+    ) as pool:
+        # Just the board and reply pipes, none of a's pipes
+        assert pool["b"]([0] * 9) == 2
+        pool["c"]([0] * 9)
+        for _ in range(5):
+            assert pool["a"]([0] * 9) == 0
+            assert pool["a"]([1, 0, 0, 0, 0, 0, 0, 0, 0]) == 1
+
+
+def test_high_fds_are_closed():
+    read_fd, write_fd = os.pipe()
+    os.dup2(read_fd, HIGH_FD)
+    try:
+        with BotHost(choose_high_fd_if_open) as host:
+            assert host([0] * 9) == 0
+    finally:
+        for fd in [read_fd, write_fd, HIGH_FD]:
+            os.close(fd)
+
+
+def test_pool():
+    with BotPool({"a": choose_first_empty, "b": choose_worker_pid}) as pool:
+        assert pool["a"]([1, 0, 0, 0, 0, 0, 0, 0, 0]) == 1
+        assert pool["a"].process.pid != pool["b"].process.pid
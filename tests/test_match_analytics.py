@@ -0,0 +1,96 @@
+import random
+
+import numpy as np
+from board_encoding import board_to_code
+from game_mechanics import Player, WildTictactoeEnv, choose_move_randomly
+from match_analytics import DRAW, LOSS, WIN, OutcomeStats, game_from_env
+
+
+def play_random_games(n_games: int):
+    games = []
+    for _ in range(n_games):
+        env = WildTictactoeEnv(choose_move_randomly)
+        state, reward, done, info = env.reset()
+        total_return = reward
+        while not done:
+            action = random.choice([idx for idx, counter in enumerate(state) if counter == " "])
+            state, reward, done, info = env.step(action)
+            total_return += reward
+        games.append((game_from_env(env), total_return))
+    return games
+
+
+def test_game_from_env_matches_reward():
+    for (went_first, moves, outcome), total_return in play_random_games(200):
+        assert {1: WIN, 0: DRAW, -1: LOSS}[total_return] == outcome
+        assert went_first in {Player.player, Player.opponent}
+        assert sorted(moves) == sorted(set(moves))
+
+
+def test_record_env():
+    env = WildTictactoeEnv(choose_move_randomly)
+    state, reward, done, info = env.reset()
+    while not done:
+        state, reward, done, info = env.step(state.index(" "))
+
+    stats = OutcomeStats()
+    stats.record_env(env)
+    assert stats.n_games == 1
+
+
+def test_counts():
+    stats = OutcomeStats()
+    # Player goes first down the left column, opponent plays the middle column
+    stats.record_game(Player.player, [0, 1, 3, 4, 6], WIN)
+    stats.record_game(Player.opponent, [4, 0, 8, 2, 1, 6, 7], LOSS)
+
+    assert stats.n_games == 2
+    assert stats.by_went_first.tolist() == [[1, 0, 0], [0, 0, 1]]
+    assert stats.opening_rates(Player.player)[0].tolist() == [1, 0, 0]
+    assert stats.opening_rates(Player.opponent)[4].tolist() == [0, 0, 1]
+    assert stats.sequence_rates(Player.player)[0, 1].tolist() == [1, 0, 0]
+
+    # The player chose a move from 3 positions in each game
+    assert stats.by_position.sum() == 6
+    assert stats.by_position[0, WIN] == 1
+    assert stats.by_position[board_to_code([1, -1, 0, 1, -1, 0, 0, 0, 0]), WIN] == 1
+    assert stats.by_position[board_to_code([0, 0, 0, 0, -1, 0, 0, 0, 0]), LOSS] == 1
+
+    board, n_losses, n_games = stats.losing_positions(n=1)[0]
+    assert n_losses == 1 and n_games == 1
+    assert len(stats.losing_positions(n=10)) == 3
+    assert stats.losing_positions(n=0) == []
+    assert OutcomeStats().losing_positions() == []
+
+
+def test_streaming_matches_single_games():
+    games = [game for game, _ in play_random_games(500)]
+
+    one_by_one = OutcomeStats()
+    for game in games:
+        one_by_one.record_game(*game)
+
+    # Small batches take the np.add.at path, large ones np.bincount
+    for batch_size in [64, 4096]:
+        streamed = OutcomeStats()
+        streamed.consume(iter(games), batch_size=batch_size)
+
+        for name in ["by_went_first", "by_opening", "by_sequence", "by_position"]:
+            assert np.array_equal(getattr(one_by_one, name), getattr(streamed, name))
+
+
+def test_merge_and_save(tmp_path):
+    games = [game for game, _ in play_random_games(300)]
+    everything = OutcomeStats()
+    everything.consume(games)
+
+    first_half, second_half = OutcomeStats(), OutcomeStats()
+    first_half.consume(games[:150])
+    second_half.consume(games[150:])
+    first_half.save(tmp_path / "first_half.npz")
+
+    merged = OutcomeStats.load(tmp_path / "first_half.npz") + second_half
+    assert merged.n_games == 300
+    assert np.array_equal(merged.by_position, everything.by_position)
+    for went_first, rates in merged.rates_by_went_first().items():
+        assert np.allclose(rates, everything.rates_by_went_first()[went_first])
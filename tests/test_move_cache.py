@@ -0,0 +1,76 @@
+from typing import List
+
+from board_encoding import canonical_code, code_to_board, transform_board
+from game_mechanics import choose_move_randomly
+from helper_bots import choose_first_empty
+from move_cache import CachedChooseMove, CachePolicy, cache_choose_move, opening_positions
+
+
+def test_first_policy_counts_hits_and_misses():
+    cached = CachedChooseMove(choose_first_empty, use_symmetry=False)
+    board = [1, -1, 0, 0, 0, 0, 0, 0, 0]
+    assert cached(board) == 2
+    assert cached(board) == 2
+    assert cached.cache_info() == {"hits": 1, "misses": 1, "maxsize": 8192, "currsize": 1}
+
+
+def test_symmetric_boards_share_an_entry():
+    cached = CachedChooseMove(choose_move_randomly)
+    board = [1, 0, 0, 0, -1, 0, 0, 0, 0]
+    first_move = cached(board)
+
+    for symmetry in range(8):
+        transformed = transform_board(board, symmetry)
+        move = cached(transformed)
+        assert transformed[move] == 0
+        # The cached move is the same square after undoing the symmetry
+        assert (
+            canonical_code(_place(transformed, move))[0]
+            == canonical_code(_place(board, first_move))[0]
+        )
+    assert cached.misses == 1
+
+
+def test_lru_eviction():
+    cached = CachedChooseMove(choose_first_empty, maxsize=2, use_symmetry=False)
+    boards = [code_to_board(code) for code in (0, 1, 3)]
+    for board in boards:
+        cached(board)
+    assert cached.cache_info()["currsize"] == 2
+    cached(boards[0])
+    assert cached.misses == 4
+
+
+def test_off_policy_never_caches():
+    cached = cache_choose_move(policy=CachePolicy.off)(choose_first_empty)
+    for _ in range(3):
+        cached([0] * 9)
+    assert cached.hits == 0
+    assert cached.cache_info()["currsize"] == 0
+
+
+def test_sampled_policy_only_returns_sampled_moves():
+    cached = CachedChooseMove(choose_move_randomly, policy=CachePolicy.sampled, n_samples=3)
+    board = [0] * 9
+    sampled = {cached(board) for _ in range(3)}
+    assert cached.misses == 3
+    for _ in range(50):
+        assert cached(board) in sampled
+
+
+def test_prewarm_openings():
+    # Canonically: 1 empty board, 3 boards with one counter, 12 with two counters
+    assert len(opening_positions(0)) == 1
+    assert len(opening_positions(1)) == 4
+    assert len(opening_positions(2)) == 16
+
+    cached = CachedChooseMove(choose_first_empty)
+    assert cached.prewarm(max_counters=2) == 16
+    cached([0] * 9)
+    assert cached.misses == 16
+
+
+def _place(board: List[int], move: int) -> List[int]:
+    board = board.copy()
+    board[move] = 1
+    return board
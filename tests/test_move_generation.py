@@ -0,0 +1,51 @@
+import numpy as np
+from move_generation import (
+    batch_blocking_moves,
+    batch_board_to_bitboards,
+    batch_fork_moves,
+    batch_legal_moves,
+    batch_winning_moves,
+    blocking_moves,
+    board_to_bitboards,
+    fork_moves,
+    legal_moves,
+    moves_to_array,
+    moves_to_list,
+    winning_moves,
+)
+from state_space import enumerate_positions
+
+
+def test_single_board():
+    board = [1, 1, 0, -1, -1, 0, 0, 0, 0]
+    own, opp = board_to_bitboards(board)
+    assert moves_to_list(legal_moves(own, opp)) == [2, 5, 6, 7, 8]
+    assert moves_to_list(winning_moves(own, opp)) == [2]
+    assert moves_to_list(blocking_moves(own, opp)) == [5]
+
+    # Blocked lines don't count
+    own, opp = board_to_bitboards([1, 1, -1, 0, 0, 0, 0, 0, 0])
+    assert winning_moves(own, opp) == 0
+
+
+def test_fork_moves():
+    # Opposite corners, taking a third corner threatens two lines
+    own, opp = board_to_bitboards([1, 0, 0, 0, -1, 0, 0, 0, 1])
+    assert moves_to_list(fork_moves(own, opp)) == [2, 6]
+    # Blocking the bottom row leaves only the top right corner
+    own, opp = board_to_bitboards([1, 0, 0, 0, -1, 0, 0, -1, 1])
+    assert moves_to_list(fork_moves(own, opp)) == [2]
+
+
+def test_batch_matches_single_board():
+    boards = enumerate_positions(include_terminal=False)["boards"]
+    own, opp = batch_board_to_bitboards(boards)
+
+    assert np.array_equal(moves_to_array(batch_legal_moves(own, opp)), boards == 0)
+    for batch_fn, single_fn in [
+        (batch_winning_moves, winning_moves),
+        (batch_blocking_moves, blocking_moves),
+        (batch_fork_moves, fork_moves),
+    ]:
+        expected = [single_fn(*board_to_bitboards(board)) for board in boards]
+        assert batch_fn(own, opp).tolist() == expected
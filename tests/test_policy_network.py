@@ -0,0 +1,64 @@
+import warnings
+
+import numpy as np
+from policy_network import PolicyValueNetwork, load_network, save_network
+from state_space import enumerate_positions
+
+
+def test_predict_batch_shapes_and_masking():
+    network = PolicyValueNetwork(seed=0, batch_capacity=8)
+    boards = np.random.default_rng(0).integers(-1, 2, size=(5000, 9))
+    boards[:, 0] = 0  # Make sure every board has a legal move
+
+    probs, values = network.predict(boards)
+    assert probs.shape == (5000, 9)
+    assert values.shape == (5000,)
+    assert network.batch_capacity >= 5000
+    assert np.allclose(probs.sum(axis=1), 1)
+    assert np.all(probs[boards != 0] == 0)
+    assert np.all(np.abs(values) <= 1)
+
+
+def test_predict_matches_single_board():
+    network = PolicyValueNetwork(seed=0)
+    boards = np.array([[0] * 9, [1, -1, 0, 0, 1, 0, 0, 0, -1]])
+    probs, values = network.predict(boards)
+    single_probs, single_values = network.predict(boards[1])
+    assert np.allclose(probs[1], single_probs[0])
+    assert np.allclose(values[1], single_values[0])
+
+
+def test_choose_move_is_legal():
+    network = PolicyValueNetwork(seed=1)
+    board = [1, -1, 1, -1, 1, -1, 0, 0, -1]
+    for _ in range(5):
+        assert board[network.choose_move(board)] == 0
+
+
+def test_save_and_load(tmp_path):
+    network = PolicyValueNetwork(hidden_sizes=(16, 8, 4), seed=2)
+    save_network(network, "team", umbrella=tmp_path)
+    loaded = load_network("team", umbrella=tmp_path)
+
+    assert loaded.hidden_sizes == (16, 8, 4)
+    boards = np.random.default_rng(0).integers(-1, 2, size=(100, 9))
+    boards[:, 4] = 0
+    for expected, actual in zip(network.predict(boards), loaded.predict(boards)):
+        assert np.allclose(expected, actual)
+
+
+def test_boards_without_legal_moves():
+    # enumerate_positions() includes full boards, which have no empty square to play
+    boards = enumerate_positions()["boards"]
+    full = np.all(boards != 0, axis=1)
+    assert full.any()
+
+    network = PolicyValueNetwork(seed=3)
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        probs, values = network.predict(boards)
+
+    assert np.all(probs[full] == 0)
+    assert np.allclose(probs[~full].sum(axis=1), 1)
+    assert not np.isnan(probs).any()
+    assert not np.isnan(values).any()
@@ -0,0 +1,99 @@
+import multiprocessing
+
+import numpy as np
+import pytest
+from policy_store import TableKind, load_policy, pack_policy
+
+
+def test_move_table_round_trip(tmp_path):
+    my_dict = {
+        (0, 0, 0, 0, 0, 0, 0, 0, 0): 4,
+        (1, 0, 0, 0, -1, 0, 0, 0, 0): 8,
+        "X   O    ": 2,
+    }
+    pack_policy(my_dict, "team", umbrella=tmp_path)
+    table = load_policy("team", umbrella=tmp_path)
+
+    assert table.kind == TableKind.moves
+    assert table.table.dtype["value"] == np.int8
+    assert len(table) == 2
+    assert table[[0] * 9] == 4
+    # "X   O    " is the same board as (1, 0, 0, 0, -1, ...), so the later value wins
+    assert table[(1, 0, 0, 0, -1, 0, 0, 0, 0)] == 2
+    assert [0, 1, 0, 0, 0, 0, 0, 0, 0] not in table
+    assert table.get([0, 1, 0, 0, 0, 0, 0, 0, 0], -1) == -1
+    with pytest.raises(KeyError):
+        table[[0, 1, 0, 0, 0, 0, 0, 0, 0]]
+
+
+def test_value_table(tmp_path):
+    pack_policy({(0,) * 9: 0.5, (1,) + (0,) * 8: -1}, "values", umbrella=tmp_path)
+    table = load_policy("values", umbrella=tmp_path)
+    assert table.kind == TableKind.values
+    assert table[(0,) * 9] == 0.5
+    assert table[(1,) + (0,) * 8] == -1.0
+    assert table.get((-1,) + (0,) * 8) is None
+
+
+def test_integer_value_table_keeps_every_value(tmp_path):
+    # Minimax style values, -1 and 0 must not be mistaken for missing boards
+    my_dict = {(0,) * 9: 1, (1,) + (0,) * 8: -1, (0, 1) + (0,) * 7: 0, (-1,) + (0,) * 8: 1000}
+    pack_policy(my_dict, "minimax", umbrella=tmp_path)
+    table = load_policy("minimax", umbrella=tmp_path)
+
+    assert table.kind == TableKind.values
+    assert len(table) == 4
+    for board, value in my_dict.items():
+        assert board in table
+        assert table[board] == value
+        assert isinstance(table.get(board), int)
+    assert (0, 0, 1) + (0,) * 6 not in table
+
+
+def test_explicit_kind(tmp_path):
+    # Every value is in range(9), but these are values not moves
+    pack_policy({(0,) * 9: 0, (1,) + (0,) * 8: 1}, "values", umbrella=tmp_path, kind="values")
+    table = load_policy("values", umbrella=tmp_path)
+    assert table.kind == TableKind.values
+    assert table[(0,) * 9] == 0
+
+    with pytest.raises(AssertionError):
+        pack_policy({(0,) * 9: -1}, "moves", umbrella=tmp_path, kind=TableKind.moves)
+
+
+def test_load_policy_is_shared_in_process(tmp_path):
+    pack_policy({(0,) * 9: 4}, "team", umbrella=tmp_path)
+    assert load_policy("team", umbrella=tmp_path) is load_policy("team", umbrella=tmp_path)
+
+
+def _lookup_empty_board(umbrella) -> int:
+    return load_policy("team", umbrella=umbrella)[(0,) * 9]
+
+
+def test_workers_attach_to_packed_table(tmp_path):
+    pack_policy({(0,) * 9: 4}, "team", umbrella=tmp_path)
+    with multiprocessing.Pool(2) as pool:
+        assert pool.map(_lookup_empty_board, [tmp_path] * 4) == [4] * 4
+
+
+def _repack_team(umbrella, move: int) -> None:
+    pack_policy({(0,) * 9: move}, "team", umbrella=umbrella)
+
+
+def test_repack_from_another_process_is_seen(tmp_path):
+    pack_policy({(0,) * 9: 4}, "team", umbrella=tmp_path)
+    assert load_policy("team", umbrella=tmp_path)[(0,) * 9] == 4
+
+    process = multiprocessing.Process(target=_repack_team, args=(tmp_path, 7))
+    process.start()
+    process.join()
+    assert process.exitcode == 0
+
+    assert load_policy("team", umbrella=tmp_path)[(0,) * 9] == 7
+
+
+def test_relative_and_absolute_paths_share_a_table(tmp_path, monkeypatch):
+    pack_policy({(0,) * 9: 4}, "team", umbrella=tmp_path)
+    monkeypatch.chdir(tmp_path.parent)
+    relative = load_policy("team", umbrella=tmp_path.name)
+    assert relative is load_policy("team", umbrella=tmp_path)
@@ -0,0 +1,141 @@
+from concurrent.futures import ThreadPoolExecutor
+from typing import List
+
+from board_encoding import board_to_code
+from game_mechanics import choose_move_randomly
+from helper_bots import choose_first_empty
+from rating_ladder import (
+    INITIAL_RATING,
+    Rating,
+    RatingDatabase,
+    RatingLadder,
+    choose_pairings,
+    play_game,
+    update_rating,
+)
+from state_space import enumerate_positions
+
+_POSITIONS = enumerate_positions()
+_BEST_MOVES = dict(zip(_POSITIONS["codes"].tolist(), _POSITIONS["best_moves"].tolist()))
+
+
+def choose_move_perfectly(board: List[int]) -> int:
+    return _BEST_MOVES[board_to_code(board)]
+
+
+def choose_off_board(board: List[int]) -> int:
+    return 99
+
+
+def choose_and_raise(board: List[int]) -> int:
+    raise ValueError("Bug in the bot")
+
+
+def choose_never(board: List[int]) -> int:
+    while True:
+        try:
+            pass
+        except Exception:
+            pass
+
+
+def test_update_rating():
+    player, opponent = Rating(), Rating()
+    winner = update_rating(player, opponent, 1)
+    loser = update_rating(opponent, player, 0)
+    assert winner.rating > INITIAL_RATING > loser.rating
+    assert abs((winner.rating - INITIAL_RATING) - (INITIAL_RATING - loser.rating)) < 1e-9
+    assert winner.rd < player.rd
+    assert winner.games == 1
+
+    drawn = update_rating(player, opponent, 0.5)
+    assert drawn.rating == INITIAL_RATING
+
+
+def test_choose_pairings_prefers_close_ratings():
+    ratings = {
+        "a": Rating(1500, 200),
+        "b": Rating(2000, 50),
+        "c": Rating(1520, 50),
+        "d": Rating(1980, 50),
+    }
+    assert choose_pairings(ratings, n_pairs=2) == [("a", "c"), ("b", "d")]
+    assert choose_pairings(ratings, n_pairs=1) == [("a", "c")]
+
+
+def test_database_persists(tmp_path):
+    database = RatingDatabase(tmp_path / "ratings.sqlite")
+    database.record_game("a", "b", 1)
+    database.close()
+
+    database = RatingDatabase(tmp_path / "ratings.sqlite")
+    assert database.n_games() == 1
+    assert database.get("a").rating > database.get("b").rating
+    assert database.get("c").games == 0
+
+
+def test_ladder_ranks_perfect_play_first(tmp_path):
+    bots = {
+        "perfect": choose_move_perfectly,
+        "random": choose_move_randomly,
+        "first_empty": choose_first_empty,
+        "random_2": choose_move_randomly,
+    }
+    with ThreadPoolExecutor(max_workers=2) as executor, RatingLadder(
+        bots, db_path=tmp_path / "ratings.sqlite", executor=executor, max_workers=2
+    ) as ladder:
+        leaderboard = ladder.run(n_games=60)
+        assert ladder.database.n_games() == 60
+
+    assert sum(rating.games for _, rating in leaderboard) == 120
+    assert leaderboard[0][0] == "perfect"
+
+
+def test_bad_bots_forfeit():
+    for _ in range(20):
+        assert play_game(choose_off_board, choose_first_empty) == 0
+        assert play_game(choose_first_empty, choose_off_board) == 1
+        assert play_game(choose_and_raise, choose_move_randomly) == 0
+        assert play_game(choose_move_randomly, choose_and_raise) == 1
+
+
+def test_ladder_keeps_going_after_bad_bots(tmp_path):
+    bots = {
+        "off_board": choose_off_board,
+        "raises": choose_and_raise,
+        "first_empty": choose_first_empty,
+        "random": choose_move_randomly,
+    }
+    with ThreadPoolExecutor(max_workers=2) as executor, RatingLadder(
+        bots, db_path=tmp_path / "ratings.sqlite", executor=executor, max_workers=2
+    ) as ladder:
+        ladder.run(n_games=40)
+        games = ladder.database.connection.execute(
+            "SELECT player, opponent, score FROM games"
+        ).fetchall()
+
+    assert len(games) == 40
+    bad_bots = {"off_board", "raises"}
+    for player, opponent, score in games:
+        if player in bad_bots and opponent not in bad_bots:
+            assert score == 0
+        elif opponent in bad_bots and player not in bad_bots:
+            assert score == 1
+
+
+def test_slow_bots_forfeit():
+    assert play_game(choose_never, choose_first_empty, move_timeout=0.1) == 0
+    assert play_game(choose_first_empty, choose_never, move_timeout=0.1) == 1
+
+
+def test_ladder_keeps_going_after_looping_bot(tmp_path):
+    bots = {"never": choose_never, "first_empty": choose_first_empty}
+    with RatingLadder(
+        bots, db_path=tmp_path / "ratings.sqlite", max_workers=2, move_timeout=0.1
+    ) as ladder:
+        ladder.run(n_games=4)
+        scores = ladder.database.connection.execute("SELECT player, score FROM games").fetchall()
+
+    assert len(scores) == 4
+    for player, score in scores:
+        assert score == (0 if player == "never" else 1)
@@ -0,0 +1,58 @@
+import numpy as np
+from board_encoding import board_to_code
+from state_space import enumerate_positions, export_dataset, iter_position_chunks, solve
+
+
+def test_number_of_positions():
+    assert len(enumerate_positions()["codes"]) == 5478
+    assert len(enumerate_positions(symmetry=True)["codes"]) == 765
+    assert len(enumerate_positions(include_terminal=False)["codes"]) == 4520
+
+
+def test_perfect_play_values():
+    values = solve()
+    # Perfect play is a draw
+    assert values[0] == 0
+    # Two in a row with the third square free, the player to move wins
+    assert values[board_to_code([1, 1, 0, -1, -1, 0, 0, 0, 0])] == 1
+    # The opponent has just completed a row
+    assert values[board_to_code([1, 1, 0, -1, -1, -1, 1, 0, 0])] == -1
+
+
+def test_labels_are_consistent():
+    positions = enumerate_positions()
+    boards, legal = positions["boards"], positions["legal"]
+    best_moves, optimal = positions["best_moves"], positions["optimal"]
+
+    playable = best_moves >= 0
+    assert np.all(legal[~playable] == False)
+    assert np.all(legal[playable] == (boards[playable] == 0))
+    assert np.all(optimal[np.arange(len(best_moves))[playable], best_moves[playable]])
+    assert np.all(optimal <= legal)
+
+    # Take the win rather than blocking
+    code = board_to_code([1, 1, 0, -1, -1, 0, 0, 0, 0])
+    idx = np.flatnonzero(positions["codes"] == code)[0]
+    assert best_moves[idx] == 2
+    assert np.flatnonzero(optimal[idx]).tolist() == [2]
+
+
+def test_chunks_and_export(tmp_path):
+    chunks = list(iter_position_chunks(chunk_size=1000))
+    assert [len(chunk["codes"]) for chunk in chunks] == [1000] * 5 + [478]
+
+    for symmetry in [False, True]:
+        expected = enumerate_positions(symmetry=symmetry)
+        streamed = {
+            name: np.concatenate([chunk[name] for chunk in iter_position_chunks(symmetry=symmetry)])
+            for name in expected
+        }
+        # Chunks come out fullest boards first, so compare in the same order
+        order = np.argsort(streamed["codes"])
+        expected_order = np.argsort(expected["codes"])
+        for name in expected:
+            assert np.array_equal(streamed[name][order], expected[name][expected_order])
+
+    path = export_dataset(tmp_path / "ttt.npz", symmetry=True)
+    with np.load(path) as dataset:
+        assert dataset["boards"].shape == (765, 9)